@@ -0,0 +1,65 @@
+"""
+Bounded pool of matplotlib figures, keyed by figsize
+Charts acquire a cleared figure, draw, save and release it instead of
+building and tearing down a new Figure on every call
+Also holds the encoding settings for transient (non-archival) dashboard images
+"""
+
+import os
+import threading
+
+# Dashboard images are only displayed, so a lossy format is fine: jpeg (default), png or webp.
+# st.image passes JPEG/PNG/GIF bytes through as-is but decodes and re-encodes anything else
+# as JPEG on every display, so webp is opt-in only
+DASHBOARD_FORMAT = os.environ.get('DASHBOARD_FMT', 'jpeg').lower()
+_DASHBOARD_PIL_KWARGS = {
+    'webp': {'quality': 85, 'method': 4},
+    'jpeg': {'quality': 85, 'optimize': False},
+    'jpg': {'quality': 85, 'optimize': False},
+    'png': {'compress_level': 3},
+}
+
+
+def dashboard_savefig_kwargs():
+    """format/pil_kwargs for fig.savefig when the image is only shown in the dashboard"""
+    return {'format': DASHBOARD_FORMAT, 'pil_kwargs': dict(_DASHBOARD_PIL_KWARGS.get(DASHBOARD_FORMAT, {}))}
+
+
+class FigurePool:
+    """
+    Reuse Agg-backed figures; keeps at most max_per_size idle figures per figsize
+    Figures are built with the object-oriented API (Figure + FigureCanvasAgg), so
+    they never enter pyplot's global figure registry and each acquired figure is
+    owned by a single caller until released
+    """
+
+    def __init__(self, max_per_size=4):
+        self.max_per_size = max_per_size
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, figsize):
+        """Return an empty figure of the given size"""
+        key = tuple(float(v) for v in figsize)
+        with self._lock:
+            idle = self._idle.get(key)
+            fig = idle.pop() if idle else None
+        if fig is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=key)
+            FigureCanvasAgg(fig)
+        else:
+            fig.clf()
+        return fig
+
+    def release(self, fig):
+        """Hand a figure back for reuse; dropped if the pool for its size is full"""
+        key = tuple(float(v) for v in fig.get_size_inches())
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_size:
+                idle.append(fig)
+
+
+FIGURE_POOL = FigurePool()
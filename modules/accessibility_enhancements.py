@@ -1,13 +1,26 @@
 import numpy as np
-from PIL import Image, ImageDraw
-import matplotlib.pyplot as plt
 from io import BytesIO
-import pandas as pd
 from collections import Counter
 import re
 import json
-from .features_extension import contrast_ratio, colorblind_contrast_ratio, compute_wcag_compliance_score
+from .features_extension import contrast_ratio, compute_wcag_compliance_score, hex_to_rgb, luminance, luminance_vec
 from .colorblind_simulator import MATRICES
+from ._fig_pool import FIGURE_POOL, dashboard_savefig_kwargs
+
+# optional libs
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def _dumps(obj):
+    """Serialize to an indented, key-sorted JSON string (orjson when available)"""
+    if HAS_ORJSON:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(obj, indent=2, sort_keys=True)
 
 # ============================================
 # FEATURE 1: Typography Analysis & Score
@@ -18,19 +31,17 @@ def analyze_typography_hierarchy(html):
     
     soup = BeautifulSoup(html, 'html.parser')
     
-    headings = {}
-    for level in range(1, 7):
-        headings[f'h{level}'] = len(soup.find_all(f'h{level}'))
+    # One traversal for all heading levels
+    heading_counts = Counter(t.name for t in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
+    headings = {f'h{level}': heading_counts.get(f'h{level}', 0) for level in range(1, 7)}
     
     # Extract inline font sizes
-    font_sizes = {}
+    font_sizes = Counter()
     for tag in soup.find_all(style=True):
         style = tag.get('style', '')
         matches = re.findall(r'font-size\s*:\s*([\d.]+)(px|em|rem|%)?', style, re.I)
         for size, unit in matches:
-            unit = unit or 'px'
-            key = f"{size}{unit}"
-            font_sizes[key] = font_sizes.get(key, 0) + 1
+            font_sizes[f"{size}{unit or 'px'}"] += 1
     
     # Scoring logic
     score = 100
@@ -70,7 +81,8 @@ def generate_typography_recs(headings, font_sizes):
 
 def plot_typography_analysis(headings, font_sizes):
     """Create visualization of typography structure"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4), facecolor='white')
+    fig = FIGURE_POOL.acquire((12, 4))
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Heading distribution
     h_labels = [k for k, v in headings.items() if v > 0]
@@ -92,10 +104,10 @@ def plot_typography_analysis(headings, font_sizes):
         ax2.spines['top'].set_visible(False)
         ax2.spines['right'].set_visible(False)
     
-    plt.tight_layout()
+    fig.tight_layout()
     buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight', facecolor='white')
+    FIGURE_POOL.release(fig)
     buf.seek(0)
     return buf
 
@@ -154,8 +166,7 @@ def generate_complementary_palette(base_hex):
 
 def create_palette_comparison_image(palettes, width=600, height=400):
     """Create visual comparison of color harmonies"""
-    img = Image.new('RGB', (width, height), (255, 255, 255))
-    draw = ImageDraw.Draw(img)
+    from PIL import Image, ImageDraw
     
     palette_names = list(palettes.keys())
     colors_per_palette = [len(v) for v in palettes.values()]
@@ -164,29 +175,50 @@ def create_palette_comparison_image(palettes, width=600, height=400):
     swatch_height = height // len(palette_names)
     swatch_width = width // max_colors
     
-    for row, (name, colors) in enumerate(palettes.items()):
+    # Stamp swatches (fill + 1px outline) straight into the pixel buffer
+    buf = np.full((height, width, 3), 255, dtype=np.uint8)
+    outline = (200, 200, 200)
+    labels = []
+    for row, colors in enumerate(palettes.values()):
         y_start = row * swatch_height
-        # Draw label
-        draw.text((10, y_start + 10), name, fill=(0, 0, 0))
-        # Draw color swatches
+        y_end = y_start + swatch_height
         for col, color in enumerate(colors):
             x_start = col * swatch_width
+            x_end = x_start + swatch_width
             rgb = tuple(int(color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-            draw.rectangle([x_start, y_start, x_start + swatch_width, y_start + swatch_height], 
-                          fill=rgb, outline=(200, 200, 200))
-            draw.text((x_start + 10, y_start + swatch_height - 20), color, fill=(255, 255, 255))
+            buf[y_start:y_end + 1, x_start:x_end + 1] = rgb
+            # Outline edges that fall outside the image are clipped
+            y_edges = [y for y in (y_start, y_end) if y < height]
+            x_edges = [x for x in (x_start, x_end) if x < width]
+            buf[y_edges, x_start:x_end + 1] = outline
+            buf[y_start:y_end + 1, x_edges] = outline
+            labels.append(((x_start + 10, y_start + swatch_height - 20), color))
+    
+    img = Image.fromarray(buf)
+    draw = ImageDraw.Draw(img)
+    for position, color in labels:
+        draw.text(position, color, fill=(255, 255, 255))
     
     return img
 
 # ============================================
 # FEATURE 3: WCAG Compliance Tracker & Report
 # ============================================
-def compute_wcag_compliance_score(colors, contrast_pairs, readability, font_data):
-    """Detailed WCAG 2.1 compliance breakdown"""
+def compute_wcag_compliance_score(colors, contrast_pairs=None, readability=None, font_data=None, *, ratios=None):
+    """Detailed WCAG 2.1 compliance breakdown
+
+    Pass precomputed contrast ratios as a numpy array via ``ratios`` to skip
+    scanning ``contrast_pairs``.
+    """
+    readability = readability or {}
     
     # Criterion 1.4.3 Contrast (Level AA)
-    aa_pairs = sum(1 for pair in contrast_pairs if pair.get('ratio', 0) >= 4.5)
-    contrast_score = (aa_pairs / max(1, len(contrast_pairs))) * 100
+    if ratios is None:
+        contrast_pairs = contrast_pairs or []
+        ratios = np.fromiter((pair.get('ratio', 0.0) for pair in contrast_pairs), dtype=np.float64, count=len(contrast_pairs))
+    ratios = np.asarray(ratios)
+    aa_pairs = int((ratios >= 4.5).sum())
+    contrast_score = (aa_pairs / max(1, ratios.size)) * 100
     
     # Criterion 1.4.4 Resize Text (assumed pass if responsive)
     resize_score = 95  # Default optimistic
@@ -217,7 +249,8 @@ def compute_wcag_compliance_score(colors, contrast_pairs, readability, font_data
 
 def create_wcag_compliance_chart(compliance_data):
     """Create radar/bar chart of WCAG compliance"""
-    fig, ax = plt.subplots(figsize=(10, 6), facecolor='white')
+    fig = FIGURE_POOL.acquire((10, 6))
+    ax = fig.subplots()
     
     categories = ['Contrast', 'Resize Text', 'Focus Order', 'Readability']
     scores = [
@@ -246,25 +279,40 @@ def create_wcag_compliance_chart(compliance_data):
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     
-    plt.tight_layout()
+    fig.tight_layout()
     buf = BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(buf, dpi=100, bbox_inches='tight', facecolor='white', **dashboard_savefig_kwargs())
+    FIGURE_POOL.release(fig)
     buf.seek(0)
     return buf
 
+# Pre-rendered certificate backgrounds (border + title), keyed by level
+_CERT_TEMPLATES = {}
+
+def _get_cert_template(level):
+    """Return a copy of the static certificate artwork for a compliance level"""
+    if level not in _CERT_TEMPLATES:
+        from PIL import Image, ImageDraw
+        
+        img = Image.new('RGB', (800, 600), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        
+        # Border
+        border_color = (102, 126, 234) if level == 'AAA' else (245, 158, 11)
+        draw.rectangle([20, 20, 780, 580], outline=border_color, width=4)
+        
+        # Title
+        draw.text((400, 80), "WCAG Compliance Certificate", fill=(0, 0, 0), anchor="mm")
+        draw.text((400, 140), f"Level {level}", fill=border_color, anchor="mm")
+        _CERT_TEMPLATES[level] = img
+    return _CERT_TEMPLATES[level].copy()
+
 def generate_wcag_certificate(compliance_data, url, timestamp):
     """Generate a compliance certificate image"""
-    img = Image.new('RGB', (800, 600), (255, 255, 255))
-    draw = ImageDraw.Draw(img)
-    
-    # Border
-    border_color = (102, 126, 234) if compliance_data['level'] == 'AAA' else (245, 158, 11)
-    draw.rectangle([20, 20, 780, 580], outline=border_color, width=4)
+    from PIL import ImageDraw
     
-    # Title
-    draw.text((400, 80), "WCAG Compliance Certificate", fill=(0, 0, 0), anchor="mm")
-    draw.text((400, 140), f"Level {compliance_data['level']}", fill=border_color, anchor="mm")
+    img = _get_cert_template(compliance_data['level'])
+    draw = ImageDraw.Draw(img)
     
     # Details
     details = [
@@ -318,50 +366,70 @@ def compute_score_breakdown(num_issues, total_pairs, readability, text_length):
 # ============================================
 # FEATURE 5: AAA Compliance Suggestions
 # ============================================
+# Relative luminance of pure black and white, computed once
+_Y_BLACK = luminance((0, 0, 0))
+_Y_WHITE = luminance((255, 255, 255))
+
 def suggest_accessible_fg(bg_hex, desired_ratio=7.0):
     """Suggest an accessible foreground color for a given background."""
     if not bg_hex:
         return '#000000'
-    if contrast_ratio(bg_hex, '#000000') >= desired_ratio:
+    y_bg = luminance(hex_to_rgb(bg_hex))
+    # Background is never darker than black nor lighter than white
+    ratio_black = (y_bg + 0.05) / (_Y_BLACK + 0.05)
+    ratio_white = (_Y_WHITE + 0.05) / (y_bg + 0.05)
+    if ratio_black >= desired_ratio:
         return '#000000'
-    if contrast_ratio(bg_hex, '#FFFFFF') >= desired_ratio:
+    if ratio_white >= desired_ratio:
         return '#FFFFFF'
-    return '#000000' if contrast_ratio(bg_hex, '#000000') > contrast_ratio(bg_hex, '#FFFFFF') else '#FFFFFF'
+    return '#000000' if ratio_black > ratio_white else '#FFFFFF'
+
+# Colorblind matrices stacked as (M, 3, 3) for batched simulation
+_CB_MATRICES = np.stack(list(MATRICES.values()))
 
 def suggest_aaa_compliant_colors(issues, pairs, colors):
     """Evaluate color pairs for WCAG AAA compliance (7.0:1) and suggest improvements."""
     aaa_compliant = 0
     needs_work = []
 
+    valid_pairs = []
+    pair_rgbs = []
     for pair in pairs:
         try:
-            # Calculate normal contrast ratio
-            ratio = contrast_ratio(pair['fg'], pair['bg'])
-            # Calculate colorblind contrast ratios
-            cb_ratios = {
-                cb_type: colorblind_contrast_ratio(pair['fg'], pair['bg'], cb_type)
-                for cb_type in MATRICES
-            }
-            # Check if pair meets AAA (7.0:1) for both normal and colorblind vision
-            if ratio >= 7.0 and all(cb_ratio >= 7.0 for cb_ratio in cb_ratios.values()):
-                aaa_compliant += 1
-            else:
-                # Suggest an accessible foreground color
-                suggested_fg = suggest_accessible_fg(pair['bg'], 7.0)
-                needs_work.append({
-                    'current': {'fg': pair['fg'], 'bg': pair['bg'], 'ratio': round(ratio, 2)},
-                    'suggested': {'fg': suggested_fg, 'bg': pair['bg'], 'ratio': round(contrast_ratio(suggested_fg, pair['bg']), 2)}
-                })
+            pair_rgbs.append((hex_to_rgb(pair['fg']), hex_to_rgb(pair['bg'])))
+            valid_pairs.append(pair)
         except Exception as e:
             print(f"[WARNING] Error analyzing pair {pair['fg']} on {pair['bg']}: {e}")
             continue
 
+    if valid_pairs:
+        rgb = np.array(pair_rgbs, dtype=np.uint8)  # (N, 2, 3): fg/bg per pair
+        # Normal contrast ratios
+        lum = luminance_vec(rgb)
+        ratios = (lum.max(axis=1) + 0.05) / (lum.min(axis=1) + 0.05)
+        # Colorblind contrast ratios for every matrix at once: (M, N, 2, 3)
+        cb_rgb = np.clip(np.einsum('mij,nkj->mnki', _CB_MATRICES, rgb / 255.0), 0, 1) * 255
+        cb_lum = luminance_vec(cb_rgb)
+        cb_ratios = (cb_lum.max(axis=2) + 0.05) / (cb_lum.min(axis=2) + 0.05)
+        # Pair meets AAA (7.0:1) for both normal and colorblind vision
+        passes = (ratios >= 7.0) & (cb_ratios >= 7.0).all(axis=0)
+        aaa_compliant = int(passes.sum())
+
+        for i in np.flatnonzero(~passes)[:15]:  # Limit to avoid overwhelming output
+            pair = valid_pairs[i]
+            # Suggest an accessible foreground color
+            suggested_fg = suggest_accessible_fg(pair['bg'], 7.0)
+            needs_work.append({
+                'current': {'fg': pair['fg'], 'bg': pair['bg'], 'ratio': round(float(ratios[i]), 2)},
+                'suggested': {'fg': suggested_fg, 'bg': pair['bg'], 'ratio': round(contrast_ratio(suggested_fg, pair['bg']), 2)}
+            })
+
     total_pairs = len(pairs) if pairs else 1  # Avoid division by zero
     percentage = (aaa_compliant / total_pairs * 100) if total_pairs else 0
 
     return {
         'aaa_compliant': aaa_compliant,
-        'needs_work': needs_work[:15],  # Limit to avoid overwhelming output
+        'needs_work': needs_work,
         'total_pairs': total_pairs,
         'percentage': round(percentage, 1)
     }
@@ -411,4 +479,4 @@ def export_analysis_json(data):
             {}
         )
     }
-    return json.dumps(export_data, indent=2, sort_keys=True)
\ No newline at end of file
+    return _dumps(export_data)
\ No newline at end of file
@@ -5,14 +5,24 @@ MATRICES = {
     "deuteranopia": np.array([[0.625,0.375,0.0],[0.7,0.3,0.0],[0.0,0.3,0.7]]),
     "tritanopia": np.array([[0.95,0.05,0.0],[0.0,0.433,0.567],[0.0,0.475,0.525]])
 }
+def _make_transform(mat):
+    # Inline the fixed 3x3 entries as Python floats so each channel is a plain
+    # elementwise expression (no matmul dispatch, stays float32)
+    (m00,m01,m02),(m10,m11,m12),(m20,m21,m22) = mat.tolist()
+    def transform(r, g, b):
+        return (r*m00 + g*m01 + b*m02,
+                r*m10 + g*m11 + b*m12,
+                r*m20 + g*m21 + b*m22)
+    return transform
+TRANSFORMS = {name: _make_transform(mat) for name, mat in MATRICES.items()}
 def simulate_and_save(pil_image, out_base):
     img = pil_image.convert('RGB')
-    arr = np.array(img)
+    arr = np.asarray(img, dtype=np.float32)/255.0
+    r, g, b = arr[...,0], arr[...,1], arr[...,2]
     paths = {}
-    for name, mat in MATRICES.items():
-        flat = arr.reshape(-1,3).astype(float)/255.0
-        transformed = (flat @ mat.T)
-        transformed = (np.clip(transformed,0,1)*255).astype('uint8').reshape(arr.shape)
+    for name, transform in TRANSFORMS.items():
+        transformed = np.stack(transform(r, g, b), axis=-1)
+        transformed = (np.clip(transformed,0,1)*255).astype('uint8')
         out = Image.fromarray(transformed)
         path = f"{out_base}_{name}.png"
         out.save(path)
@@ -1,17 +1,37 @@
 from modules.colorblind_simulator import MATRICES  # Import for colorblind matrices
+from modules._fig_pool import FIGURE_POOL
 import numpy as np
-import matplotlib.pyplot as plt
 from io import BytesIO
+import functools
 
 # Helper: Convert hex to RGB
+@functools.lru_cache(maxsize=1024)
 def hex_to_rgb(hex_str):
-    hex_str = hex_str.lstrip('#')
-    if len(hex_str) == 3:
-        hex_str = ''.join(c * 2 for c in hex_str)
-    return tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+    h = hex_str.lstrip('#')
+    if len(h) == 3:
+        h = h[0] * 2 + h[1] * 2 + h[2] * 2
+    if len(h) < 6:
+        raise ValueError(f"invalid hex color: {hex_str!r}")
+    # One parse of the 24-bit value (any alpha digits past 6 are ignored), then shift out the channels
+    v = int(h[:6], 16)
+    return (v >> 16, (v >> 8) & 0xFF, v & 0xFF)
+
+# sRGB -> linear lookup table for 8-bit channel values (WCAG formula)
+_SRGB_LUT = np.array([
+    v / 12.92 if v <= 0.03928 else ((v + 0.055) / 1.055) ** 2.4
+    for v in (i / 255.0 for i in range(256))
+])
+_SRGB_LUT_LIST = _SRGB_LUT.tolist()
+_WCAG_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+_WCAG_WEIGHTS_F32 = _WCAG_WEIGHTS.astype(np.float32)
 
 # Helper: Calculate relative luminance (WCAG standard)
 def luminance(rgb):
+    r, g, b = rgb
+    if type(r) is int and type(g) is int and type(b) is int:
+        lut = _SRGB_LUT_LIST
+        return 0.2126 * lut[r] + 0.7152 * lut[g] + 0.0722 * lut[b]
+    # Non-integer channels (e.g. colorblind-simulated) use the formula directly
     def linearize(v):
         v = v / 255.0
         return v / 12.92 if v <= 0.03928 else ((v + 0.055) / 1.055) ** 2.4
@@ -19,6 +39,7 @@ def luminance(rgb):
     return 0.2126 * r + 0.7152 * g + 0.0722 * b
 
 # Helper: Standard contrast ratio (WCAG)
+@functools.lru_cache(maxsize=4096)
 def contrast_ratio(fg_hex, bg_hex):
     l1 = luminance(hex_to_rgb(fg_hex))
     l2 = luminance(hex_to_rgb(bg_hex))
@@ -26,6 +47,11 @@ def contrast_ratio(fg_hex, bg_hex):
 
 # Helper: Colorblind transformation and contrast ratio
 def colorblind_contrast_ratio(fg_hex, bg_hex, cb_type):
+    return _cb_ratio_cached(fg_hex, bg_hex, cb_type)
+
+# MATRICES is fixed at import, so (fg, bg, cb_type) fully determines the ratio
+@functools.lru_cache(maxsize=4096)
+def _cb_ratio_cached(fg_hex, bg_hex, cb_type):
     mat = MATRICES[cb_type]
     fg_rgb = hex_to_rgb(fg_hex)
     bg_rgb = hex_to_rgb(bg_hex)
@@ -39,6 +65,36 @@ def colorblind_transform(rgb, mat):
     flat = np.array(rgb).astype(float) / 255.0
     transformed = flat @ mat.T
     return np.clip(transformed, 0, 1) * 255
+
+# Helper: Parse many hex colors at once into an (N, 3) uint8 array
+def hex_array_to_rgb(hex_list):
+    digits = []
+    for hex_str in hex_list:
+        hex_str = hex_str.lstrip('#')
+        if len(hex_str) == 3:
+            hex_str = ''.join(c * 2 for c in hex_str)
+        if len(hex_str) < 6:
+            raise ValueError(f"Invalid hex color: {hex_str!r}")
+        digits.append(hex_str[:6])
+    return np.frombuffer(bytes.fromhex(''.join(digits)), dtype=np.uint8).reshape(-1, 3)
+
+# Helper: Relative luminance (WCAG) for an (..., 3) array of 0-255 RGB values
+# dtype=np.float32 halves the bandwidth for large batches (SGEMV); keep the float64
+# default wherever the result is compared against WCAG thresholds
+def luminance_vec(rgb, dtype=np.float64):
+    rgb = np.asarray(rgb)
+    weights = _WCAG_WEIGHTS_F32 if dtype == np.float32 else _WCAG_WEIGHTS
+    if rgb.dtype.kind in 'ui':
+        return _SRGB_LUT.astype(dtype, copy=False)[rgb] @ weights
+    v = rgb.astype(dtype, copy=False) / dtype(255.0)
+    lin = np.where(v <= 0.03928, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+    return lin @ weights
+
+# Helper: Contrast ratios (WCAG) between matching rows of two RGB arrays
+def contrast_ratios_vec(fg_arr, bg_arr):
+    l1 = luminance_vec(fg_arr)
+    l2 = luminance_vec(bg_arr)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
 def compute_wcag_compliance_score(issues, pairs):
     """Compute a WCAG compliance score based on the number of contrast issues."""
     try:
@@ -54,26 +110,41 @@ def plot_lowest_contrast_pairs(issues, buf=True):
     if not issues:
         return None
     
-    # Enhance issues with colorblind ratios (if not already present)
-    for issue in issues:
-        if 'cb_ratios' not in issue:
+    # Enhance issues with colorblind ratios (if not already present), all pairs at once
+    pending = [issue for issue in issues if 'cb_ratios' not in issue]
+    if pending:
+        # Foregrounds then backgrounds in one (2N, 3) stack: one matmul per matrix
+        n = len(pending)
+        rgb = hex_array_to_rgb([issue['fg'] for issue in pending] + [issue['bg'] for issue in pending]) / 255.0
+        for issue in pending:
             issue['cb_ratios'] = {}
-            for cb_type in MATRICES:
-                issue['cb_ratios'][cb_type] = colorblind_contrast_ratio(issue['fg'], issue['bg'], cb_type)
+        for cb_type, mat in MATRICES.items():
+            rgb_cb = np.clip(rgb @ mat.T, 0, 1) * 255
+            ratios = contrast_ratios_vec(rgb_cb[:n], rgb_cb[n:])
+            for issue, ratio in zip(pending, ratios):
+                issue['cb_ratios'][cb_type] = ratio
     
-    # Compute min_ratio for sorting (lowest across normal + colorblind)
-    for issue in issues:
-        all_ratios = [issue['ratio']] + list(issue['cb_ratios'].values())
-        issue['min_ratio'] = min(all_ratios)
+    # Compute min_ratio for sorting (lowest across normal + colorblind), shape (N, 1 + len(MATRICES))
+    ratios_matrix = np.array([[issue['ratio']] + [issue['cb_ratios'][cb_type] for cb_type in MATRICES] for issue in issues])
+    min_ratios = ratios_matrix.min(axis=1)
+    for issue, min_ratio in zip(issues, min_ratios):
+        issue['min_ratio'] = min_ratio
     
-    # Select and sort top 5 lowest by min_ratio
-    lowest = sorted(issues, key=lambda x: x['min_ratio'])[:5]
+    # Select and sort top 5 lowest by min_ratio: O(N) partition, then order only the candidates.
+    # Every value tied with the 5th smallest is kept as a candidate so ties resolve
+    # in list order, exactly like a stable sort
+    k = min(5, len(issues))
+    kth = np.partition(min_ratios, k - 1)[k - 1]
+    candidates = np.flatnonzero(min_ratios <= kth)
+    candidates = candidates[np.argsort(min_ratios[candidates], kind='stable')][:k]
+    lowest = [issues[i] for i in candidates]
     
     if not lowest:
         return None
     
     # Plot grouped bars
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = FIGURE_POOL.acquire((12, 6))
+    ax = fig.subplots()
     types = ['Normal'] + list(MATRICES.keys())
     width = 0.2
     ind = np.arange(len(lowest))
@@ -92,12 +163,12 @@ def plot_lowest_contrast_pairs(issues, buf=True):
     ax.legend(loc='upper right')
     ax.set_ylim(0, max(7.5, max([p['ratio'] for p in lowest]) + 1))
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if buf:
         buf_obj = BytesIO()
-        plt.savefig(buf_obj, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close()
+        fig.savefig(buf_obj, format='png', dpi=100, facecolor='white', pil_kwargs={'compress_level': 3})
+        FIGURE_POOL.release(fig)
         buf_obj.seek(0)
         return buf_obj
     else:
@@ -4,88 +4,151 @@ No random numbers, no defaults - based on actual button/image counts
 Enhanced: More dynamic based on text, headings, colors, and readability for per-website variation
 """
 
-import matplotlib.pyplot as plt
+import logging
 import numpy as np
-import seaborn as sns
 import os
 from io import BytesIO
+from ._fig_pool import FIGURE_POOL, dashboard_savefig_kwargs
+from .features_extension import luminance_vec
 
-def generate_simple_heatmap(buttons, images, text_length=0, headings={}, colors_count=0, readability_score=50, out_path=None):
+logger = logging.getLogger(__name__)
+
+def _build_attention_grid(buttons, images, text_length, headings, colors_count, readability_score):
     """
-    Generate attention heatmap based on ACTUAL website data
-    Uses real button count, image count, text length, headings, colors, and readability to create UNIQUE patterns per website
+    Build the normalized 6x12 attention grid from website data
+    Returns (grid, top_attention, mid_attention, bottom_attention); the zone values are 0.0 when the page has no content
     """
     # Grid setup: 6 rows (top to bottom), 12 columns (left to right)
     H, W = 6, 12
     grid = np.zeros((H, W))
+    top_attention = mid_attention = bottom_attention = 0.0
     
     # Calculate weights based on ACTUAL content
     num_buttons = len(buttons) if buttons else 0
     num_images = len(images) if images else 0
-    num_headings = sum(headings.values()) if headings else 0  # Total headings for structure depth
     text_density = min(1.0, text_length / 2000.0)  # Normalize text length (high = content-heavy)
     color_variety = min(1.0, colors_count / 50.0)  # Normalize colors (high = vibrant site)
     readability_factor = readability_score / 100.0  # 0-1 scale (high readability = more sustained attention)
     
-    print(f"[HEATMAP] Generating with {num_buttons} buttons, {num_images} images, {text_length} words, {num_headings} headings, {colors_count} colors, readability {readability_score}")
-    
     # Realistic attention patterns based on actual content
     if num_buttons == 0 and num_images == 0 and text_length < 100:
         # No interactive/content - uniform low attention
-        grid[:, :] = 0.3
+        grid.fill(0.3)
     else:
         # Top rows: Navigation/Header area (buttons + headings like H1/H2)
         top_attention = min(1.0, 0.4 + (num_buttons / 15.0) + (headings.get('h1', 0) + headings.get('h2', 0)) / 10.0)
-        grid[0:2, :] = top_attention * (1.0 + color_variety * 0.2)  # Boost if vibrant colors
         
         # Middle rows: Content area (images + text + lower headings)
         mid_attention = min(1.0, 0.5 + (num_images / 10.0) + text_density * 0.3 + (headings.get('h3', 0) + headings.get('h4', 0)) / 8.0)
         mid_attention *= readability_factor  # Reduce if hard to read
-        grid[2:4, :] = mid_attention
         
         # Bottom rows: Footer/CTA (some buttons + lower content)
         bottom_attention = min(0.8, 0.3 + (num_buttons / 20.0) + (headings.get('h5', 0) + headings.get('h6', 0)) / 10.0)
-        grid[4:6, :] = bottom_attention
+        
+        # Per-row zone levels; top boosted if vibrant colors
+        row_attn = np.empty(H)
+        row_attn[0:2] = top_attention * (1.0 + color_variety * 0.2) if color_variety else top_attention
+        row_attn[2:4] = mid_attention
+        row_attn[4:6] = bottom_attention
         
         # Add natural variation based on analysis (not random)
-        for row in range(H):
-            for col in range(W):
-                # Left side bias (F-pattern), stronger if more text/headings (reading-heavy sites)
-                left_bias = 1.0 - (col / W) * (0.3 + text_density * 0.2)
-                grid[row, col] *= left_bias
-                
-                # Add "hot spots" for images/buttons (scatter based on counts)
-                if num_images > 5 and row in [2,3] and col % 3 == 0:  # Middle hotspots for image-heavy
-                    grid[row, col] += 0.2
-                if num_buttons > 10 and row in [0,5] and col % 2 == 0:  # Top/bottom hotspots for button-heavy
-                    grid[row, col] += 0.15
+        # Left side bias (F-pattern), stronger if more text/headings (reading-heavy sites)
+        left_bias = 1.0 - (np.arange(W) / W) * (0.3 + text_density * 0.2)
+        np.outer(row_attn, left_bias, out=grid)  # zones x bias in a single write pass
+        
+        # Add "hot spots" for images/buttons (scatter based on counts)
+        if num_images > 5:  # Middle hotspots for image-heavy
+            grid[2:4, ::3] += 0.2
+        if num_buttons > 10:  # Top/bottom hotspots for button-heavy
+            grid[[0, 5], ::2] += 0.15
     
     # Normalize to 0-1 range
     if grid.max() > 0:
-        grid = np.clip(grid / grid.max(), 0, 1)  # Clip to avoid overflow
+        grid /= grid.max()
+        np.clip(grid, 0, 1, out=grid)  # Negative Flesch ease makes mid_attention negative
     else:
-        grid[:, :] = 0.3  # Fallback if all zeros
+        grid.fill(0.3)  # Fallback if all zeros
+    
+    return grid, top_attention, mid_attention, bottom_attention
+
+
+def _draw_attention_heatmap(ax, grid, cbar_label, annot_size, linecolor='white', shrink=1.0, annotate=True):
+    """
+    Draw the attention grid with imshow: colorbar, cell borders and value annotations
+    Red (high focus) to Green (low focus), fixed 0-1 scale
+    """
+    H, W = grid.shape
+    im = ax.imshow(grid, cmap="RdYlGn_r", vmin=0, vmax=1, aspect='auto')
+    ax.figure.colorbar(im, ax=ax, shrink=shrink, label=cbar_label)
+    
+    # Grid lines between cells
+    ax.set_xticks(np.arange(W + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(H + 1) - 0.5, minor=True)
+    ax.grid(which='minor', color=linecolor, linewidth=0.5)
+    ax.tick_params(which='minor', length=0)
+    ax.set_xticks(np.arange(W))
+    ax.set_yticks(np.arange(H))
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    
+    # Show numbers in cells, dark text on light cells and vice versa
+    if annotate:
+        cell_lum = luminance_vec(im.cmap(im.norm(grid))[..., :3] * 255, dtype=np.float32)
+        for row, col in np.ndindex(grid.shape):
+            ax.text(col, row, f"{grid[row, col]:.2f}", ha='center', va='center', fontsize=annot_size,
+                    color='black' if cell_lum[row, col] > 0.408 else 'white')
+    return im
+
+
+# Stats panel text, built once; each call only fills in the numbers
+_STATS_TEXT = """
+HEATMAP ANALYSIS SUMMARY
+
+Content Distribution:
+├─ Buttons/Links: {num_buttons}
+├─ Images: {num_images}
+├─ Words: {text_length}
+├─ Headings: {num_headings}
+├─ Unique Colors: {colors_count}
+└─ Readability: {readability_score}/100
+
+Attention Zones:
+├─ High Focus (>0.7): {high_focus} cells
+├─ Medium Focus: {med_focus} cells
+└─ Low Focus (<0.4): {low_focus} cells
+
+Pattern Analysis:
+• Customized F-pattern based on content
+• Top: High if buttons/headings ({top_attention:.2f} base)
+• Middle: Boosted by images/text/readability ({mid_attention:.2f} base)
+• Bottom: CTAs if buttons ({bottom_attention:.2f} base)
+• Vibrancy boost from colors: +{color_boost:.0f}%
+
+Data Source: Real website analysis
+(Not randomized or estimated)
+"""
+
+def generate_simple_heatmap(buttons, images, text_length=0, headings={}, colors_count=0, readability_score=50, out_path=None, annotate=True):
+    """
+    Generate attention heatmap based on ACTUAL website data
+    Uses real button count, image count, text length, headings, colors, and readability to create UNIQUE patterns per website
+    annotate=False skips the per-cell value labels (the slowest part of the draw); recommended for batched report generation
+    """
+    H, W = 6, 12
+    num_buttons = len(buttons) if buttons else 0
+    num_images = len(images) if images else 0
+    num_headings = sum(headings.values()) if headings else 0  # Total headings for structure depth
+    
+    logger.debug("Heatmap: btns=%d imgs=%d words=%d headings=%d colors=%d read=%s",
+                 num_buttons, num_images, text_length, num_headings, colors_count, readability_score)
+    
+    grid, _, _, _ = _build_attention_grid(buttons, images, text_length, headings, colors_count, readability_score)
     
     # Create figure
-    fig, ax = plt.subplots(figsize=(12, 6), facecolor='white')
-    
-    # Create heatmap with seaborn
-    sns.heatmap(
-        grid,
-        ax=ax,
-        cmap="RdYlGn_r",           # Red (high focus) to Green (low focus)
-        annot=True,                # Show numbers in cells
-        fmt=".2f",                 # Format: 2 decimal places
-        linewidths=0.5,            # Grid lines between cells
-        linecolor='gray',          # Grid color
-        cbar_kws={
-            'label': 'Attention Focus Level',
-            'shrink': 0.8
-        },
-        annot_kws={'size': 8},     # Annotation font size
-        vmin=0,                    # Minimum value (green)
-        vmax=1,                    # Maximum value (red),
-    )
+    fig = FIGURE_POOL.acquire((12, 6))
+    ax = fig.subplots()
+    
+    _draw_attention_heatmap(ax, grid, 'Attention Focus Level', annot_size=8, linecolor='gray', shrink=0.8, annotate=annotate)
     
     # Labels and title
     ax.set_title(
@@ -102,81 +165,43 @@ def generate_simple_heatmap(buttons, images, text_length=0, headings={}, colors_
     ax.set_xticklabels([f'{i}' for i in range(W)], rotation=0)
     ax.set_yticklabels([f'{i}' for i in range(H)], rotation=0)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if out_path:
         # Save to file
         os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
-        fig.savefig(out_path, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.savefig(out_path, format='png', dpi=100, facecolor='white', pil_kwargs={'compress_level': 3})
+        FIGURE_POOL.release(fig)
         return out_path
     else:
         # Return in-memory BytesIO for Streamlit
         buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.savefig(buf, dpi=100, facecolor='white', **dashboard_savefig_kwargs())
+        FIGURE_POOL.release(fig)
         buf.seek(0)
         return buf
 
 
-def generate_heatmap_with_stats(buttons, images, text_length=0, headings={}, colors_count=0, readability_score=50, out_path=None):
+def generate_heatmap_with_stats(buttons, images, text_length=0, headings={}, colors_count=0, readability_score=50, out_path=None, annotate=True):
     """
     Advanced version: Heatmap + statistics side-by-side
     Uses ACTUAL website data with enhanced variation
+    annotate=False skips the per-cell value labels; recommended for batched report generation
     """
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), facecolor='white')
-    
-    # Left: Heatmap (same enhanced logic as above)
-    H, W = 6, 12
-    grid = np.zeros((H, W))
+    fig = FIGURE_POOL.acquire((14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
+    # Left: Heatmap (same grid as generate_simple_heatmap)
     num_buttons = len(buttons) if buttons else 0
     num_images = len(images) if images else 0
     num_headings = sum(headings.values()) if headings else 0
-    text_density = min(1.0, text_length / 2000.0)
     color_variety = min(1.0, colors_count / 50.0)
-    readability_factor = readability_score / 100.0
     
-    if num_buttons == 0 and num_images == 0 and text_length < 100:
-        grid[:, :] = 0.3
-    else:
-        top_attention = min(1.0, 0.4 + (num_buttons / 15.0) + (headings.get('h1', 0) + headings.get('h2', 0)) / 10.0)
-        grid[0:2, :] = top_attention * (1.0 + color_variety * 0.2)
-        
-        mid_attention = min(1.0, 0.5 + (num_images / 10.0) + text_density * 0.3 + (headings.get('h3', 0) + headings.get('h4', 0)) / 8.0)
-        mid_attention *= readability_factor
-        grid[2:4, :] = mid_attention
-        
-        bottom_attention = min(0.8, 0.3 + (num_buttons / 20.0) + (headings.get('h5', 0) + headings.get('h6', 0)) / 10.0)
-        grid[4:6, :] = bottom_attention
-        
-        for row in range(H):
-            for col in range(W):
-                left_bias = 1.0 - (col / W) * (0.3 + text_density * 0.2)
-                grid[row, col] *= left_bias
-                
-                if num_images > 5 and row in [2,3] and col % 3 == 0:
-                    grid[row, col] += 0.2
-                if num_buttons > 10 and row in [0,5] and col % 2 == 0:
-                    grid[row, col] += 0.15
-    
-    if grid.max() > 0:
-        grid = np.clip(grid / grid.max(), 0, 1)
-    else:
-        grid[:, :] = 0.3
-    
-    sns.heatmap(
-        grid,
-        ax=ax1,
-        cmap="RdYlGn_r",
-        annot=True,
-        fmt=".2f",
-        linewidths=0.5,
-        cbar_kws={'label': 'Focus Level'},
-        annot_kws={'size': 7},
-        vmin=0,
-        vmax=1,
+    grid, top_attention, mid_attention, bottom_attention = _build_attention_grid(
+        buttons, images, text_length, headings, colors_count, readability_score
     )
+    
+    _draw_attention_heatmap(ax1, grid, 'Focus Level', annot_size=7, annotate=annotate)
     ax1.set_title(f"Attention Heatmap", fontsize=12, fontweight='bold')
     ax1.invert_yaxis()
     
@@ -188,32 +213,13 @@ def generate_heatmap_with_stats(buttons, images, text_length=0, headings={}, col
     med_focus = np.sum((grid >= 0.4) & (grid <= 0.7))
     low_focus = np.sum(grid < 0.4)
     
-    stats_text = f"""
-HEATMAP ANALYSIS SUMMARY
-
-Content Distribution:
-├─ Buttons/Links: {num_buttons}
-├─ Images: {num_images}
-├─ Words: {text_length}
-├─ Headings: {num_headings}
-├─ Unique Colors: {colors_count}
-└─ Readability: {readability_score}/100
-
-Attention Zones:
-├─ High Focus (>0.7): {high_focus} cells
-├─ Medium Focus: {med_focus} cells
-└─ Low Focus (<0.4): {low_focus} cells
-
-Pattern Analysis:
-• Customized F-pattern based on content
-• Top: High if buttons/headings ({top_attention:.2f} base)
-• Middle: Boosted by images/text/readability ({mid_attention:.2f} base)
-• Bottom: CTAs if buttons ({bottom_attention:.2f} base)
-• Vibrancy boost from colors: +{color_variety*20:.0f}%
-
-Data Source: Real website analysis
-(Not randomized or estimated)
-"""
+    stats_text = _STATS_TEXT.format(
+        num_buttons=num_buttons, num_images=num_images, text_length=text_length,
+        num_headings=num_headings, colors_count=colors_count, readability_score=readability_score,
+        high_focus=high_focus, med_focus=med_focus, low_focus=low_focus,
+        top_attention=top_attention, mid_attention=mid_attention, bottom_attention=bottom_attention,
+        color_boost=color_variety * 20,
+    )
     
     ax2.text(0.1, 0.5, stats_text, 
              fontsize=10, 
@@ -221,16 +227,16 @@ Data Source: Real website analysis
              verticalalignment='center',
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if out_path:
         os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
-        fig.savefig(out_path, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.savefig(out_path, format='png', dpi=100, facecolor='white', pil_kwargs={'compress_level': 3})
+        FIGURE_POOL.release(fig)
         return out_path
     else:
         buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.savefig(buf, dpi=100, facecolor='white', **dashboard_savefig_kwargs())
+        FIGURE_POOL.release(fig)
         buf.seek(0)
         return buf
\ No newline at end of file
@@ -3,367 +3,617 @@ COMPLETE PDF REPORT GENERATOR - FIXED Variable Naming Conflict
 Save as: modules/pdf_report_complete.py
 """
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors as rl_colors  # <-- RENAMED TO AVOID CONFLICT
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
 from datetime import datetime
+from collections import OrderedDict
+import functools
+import hashlib
+import shutil
+import tempfile
+import threading
 import traceback
-from PIL import Image as PILImage
 
-def generate_complete_pdf_report(analysis_data):
+# Metrics-table status labels, indexed by the number of thresholds passed (score >= 60, >= 80) / issues present
+_SCORE_STATUS = ('Needs Work', 'Fair', 'Good')
+_ISSUES_STATUS = ('Pass', 'Action Required')
+
+# Resolution embedded images are downscaled to; plenty for on-screen PDFs
+_EMBED_DPI = 150
+
+# Drawn size (inches) of each image the report embeds, keyed by its analysis_data entry
+_IMAGE_BOXES = {
+    'score_breakdown_chart': (4.5, 3.0),
+    'contrast_chart': (5.5, 2.2),
+    'palette_img': (5.5, 1.5),
+    'palette_cb': (5.5, 1.5),
+    'aaa_chart': (5.5, 2.2),
+    'heatmap': (5.5, 2.2),
+    'typography_chart': (5.5, 2.2),
+}
+
+# Finished PDFs keyed by a digest of their inputs, so an identical re-run skips the whole build
+_PDF_CACHE = OrderedDict()
+_PDF_CACHE_SIZE = 8
+_PDF_CACHE_LOCK = threading.Lock()
+
+# ===== CUSTOM STYLES (TIGHTENED SPACING) =====
+@functools.lru_cache(maxsize=None)
+def _report_styles():
     """
-    Generate complete PDF with ALL visualizations
-    FIXED: Variable naming conflict resolved
+    Paragraph and table styles shared by every report, built on first use
+    ReportLab is imported here rather than at module load so the app starts without it
     """
+    from reportlab.lib import colors as rl_colors  # <-- RENAMED TO AVOID CONFLICT
+    from reportlab.lib.units import inch
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    from reportlab.platypus import TableStyle
     
-    try:
-        pdf_buffer = BytesIO()
-        
-        doc = SimpleDocTemplate(
-            pdf_buffer,
-            pagesize=letter,
-            rightMargin=0.4*inch,
-            leftMargin=0.4*inch,
-            topMargin=0.4*inch,
-            bottomMargin=0.4*inch
-        )
-        
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # ===== CUSTOM STYLES (TIGHTENED SPACING) =====
-        title_style = ParagraphStyle(
+    # Built once; getSampleStyleSheet() instantiates every default style
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
             'Title',
-            parent=styles['Heading1'],
+            parent=base['Heading1'],
             fontSize=20,
             textColor=rl_colors.HexColor('#667eea'),
             spaceAfter=0.02*inch,
             spaceBefore=0,
             alignment=TA_CENTER,
             fontName='Helvetica-Bold'
-        )
-        
-        heading_style = ParagraphStyle(
+        ),
+        'heading': ParagraphStyle(
             'Heading',
-            parent=styles['Heading2'],
+            parent=base['Heading2'],
             fontSize=12,
             textColor=rl_colors.HexColor('#667eea'),
             spaceAfter=0.02*inch,
             spaceBefore=0.03*inch,
             fontName='Helvetica-Bold'
-        )
-        
-        subheading_style = ParagraphStyle(
+        ),
+        'subheading': ParagraphStyle(
             'SubHeading',
-            parent=styles['Heading3'],
+            parent=base['Heading3'],
             fontSize=10,
             textColor=rl_colors.HexColor('#333333'),
             spaceAfter=0.01*inch,
             spaceBefore=0.02*inch,
             fontName='Helvetica-Bold'
-        )
-        
-        normal_style = ParagraphStyle(
+        ),
+        'normal': ParagraphStyle(
             'Normal',
-            parent=styles['Normal'],
+            parent=base['Normal'],
             fontSize=9,
             alignment=TA_LEFT,
             spaceAfter=0.01*inch,
             spaceBefore=0
-        )
-        
-        small_style = ParagraphStyle(
+        ),
+        'small': ParagraphStyle(
             'Small',
-            parent=styles['Normal'],
+            parent=base['Normal'],
             fontSize=8,
             alignment=TA_LEFT,
             spaceAfter=0.01*inch,
             spaceBefore=0
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=base['Normal'],
+            fontSize=8,
+            alignment=TA_LEFT,
+            textColor=rl_colors.grey,
+            spaceAfter=0,
+            spaceBefore=0
+        ),
+        'metrics_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), rl_colors.HexColor('#667eea')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), rl_colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
+            ('TOPPADDING', (0, 0), (-1, 0), 5),
+            ('GRID', (0, 0), (-1, -1), 0.5, rl_colors.grey),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [rl_colors.white, rl_colors.HexColor('#f5f5f5')])
+        ]),
+    }
+
+# ===== STATIC REPORT MARKUP =====
+# Identical in every report, so kept as constants (and parsed once via _static_paragraph)
+_WCAG_GUIDELINES_HTML = """
+<b>Four Core Principles (POUR):</b><br/>
+<b>1. Perceivable:</b> Information must be presentable to all users<br/>
+<b>2. Operable:</b> Interface must be operable by all users<br/>
+<b>3. Understandable:</b> Content and operations must be clear<br/>
+<b>4. Robust:</b> Compatible with assistive technologies<br/>
+<br/>
+<b>Contrast Standards:</b><br/>
+• Level A: 3:1 minimum<br/>
+• Level AA: 4.5:1 for normal text, 3:1 for large text<br/>
+• Level AAA: 7:1 for normal text, 4.5:1 for large text<br/>
+<br/>
+<b>Implementation Checklist:</b><br/>
+• Add alt text to all images<br/>
+• Use semantic HTML5 elements<br/>
+• Ensure keyboard navigation works<br/>
+• Provide focus indicators<br/>
+• Test with screen readers (NVDA, JAWS)<br/>
+• Maintain consistent navigation<br/>
+• Use proper heading hierarchy
+"""
+
+_AAA_NOTE_HTML = """
+<b>AAA Compliance Information</b><br/>
+AAA level requires 7:1 contrast ratio for normal text and 4.5:1 for large text.<br/>
+Review the contrast issues section for detailed information.
+"""
+
+_FLESCH_SCALE_HTML = "(90-100=Very Easy | 60-70=Easy | 50-60=Moderate | Below 50=Difficult)<br/>"
+
+_BEST_PRACTICES_HTML = """
+<br/>
+<b>Best Practices:</b><br/>
+• Keep sentences under 20 words average<br/>
+• Use minimum 16px font size for body text<br/>
+• Maintain line-height between 1.5-1.6x<br/>
+• Break paragraphs into smaller chunks<br/>
+• Use clear heading hierarchy (H1 → H6)
+"""
+
+_FOOTER_TAIL_HTML = """
+<br/>
+<b>Recommended Next Steps:</b><br/>
+1. Fix all contrast issues (minimum 4.5:1 ratio)<br/>
+2. Improve content readability (aim for 60+ Flesch score)<br/>
+3. Test manually with keyboard navigation<br/>
+4. Use screen reader software (NVDA/JAWS)<br/>
+5. Re-run this analysis after fixes<br/>
+<br/>
+<b>Learn More:</b><br/>
+• WCAG 2.1: https://www.w3.org/WAI/WCAG21/<br/>
+• WebAIM Contrast Checker: https://webaim.org/resources/contrastchecker/<br/>
+• Accessible Colors: https://accessible-colors.com/<br/>
+• A11Y Project: https://www.a11yproject.com/<br/>
+<br/>
+<i>Report generated by Vision Chroma Pro Professional Edition</i>
+"""
+
+# Parsed fragments of constant markup, keyed by (text, style name)
+_STATIC_FRAGS = {}
+
+def _static_paragraph(text, style):
+    """Paragraph for constant markup; ReportLab's paraparser runs once per process instead of per report"""
+    from reportlab.platypus import Paragraph
+    
+    key = (text, style.name)
+    cached = _STATIC_FRAGS.get(key)
+    if cached is None:
+        para = Paragraph(text, style)
+        cached = _STATIC_FRAGS[key] = (para.text, para.frags)
+    return Paragraph(cached[0], style, frags=cached[1])
+
+def _wcag_guidelines_section(styles):
+    """Flowables for the constant WCAG guidelines section; fresh objects each call (build mutates flowables)"""
+    from reportlab.platypus import Spacer
+    from reportlab.lib.units import inch
+    
+    return [
+        _static_paragraph("WCAG 2.1 Compliance Guidelines", styles['heading']),
+        _static_paragraph(_WCAG_GUIDELINES_HTML, styles['small']),
+        Spacer(1, 0.15*inch),
+    ]
+
+def _jpeg_buffer(src, quality=80, max_px=None):
+    """
+    Re-encode a PIL image or image buffer as JPEG so ReportLab embeds it as DCT data
+    instead of Flate-compressed raw pixels; images with real transparency are kept lossless (PNG)
+    max_px=(w, h) first downscales (aspect kept) so no more pixels are stored than get rendered
+    """
+    from PIL import Image as PILImage
+    
+    if isinstance(src, bytes):
+        src = PILImage.open(BytesIO(src))
+    elif hasattr(src, 'getvalue'):
+        # getvalue() ignores the stream position: no seek(0) on the caller's buffer, and the same
+        # buffer can be encoded from two pool threads without racing on a shared position
+        src = PILImage.open(BytesIO(src.getvalue()))
+    elif hasattr(src, 'seek') and not isinstance(src, PILImage.Image):
+        src.seek(0)
+        src = PILImage.open(src)
+    if max_px and (src.width > max_px[0] or src.height > max_px[1]):
+        src = src.copy()  # thumbnail works in place; never touch the caller's image
+        src.thumbnail(max_px, PILImage.LANCZOS)
+    out = BytesIO()
+    # matplotlib writes RGBA PNGs even with an opaque facecolor; only keep alpha that is used
+    has_alpha = ('transparency' in src.info or
+                 (src.mode in ('RGBA', 'LA') and src.getchannel('A').getextrema()[0] < 255))
+    if has_alpha:
+        src.save(out, format='PNG')
+    else:
+        src.convert('RGB').save(out, format='JPEG', quality=quality, optimize=True)
+    out.seek(0)
+    return out
+
+def _fit_image(src, width, height):
+    """JPEG buffer for an image drawn at width x height points, downscaled to _EMBED_DPI"""
+    from reportlab.lib.units import inch
+    
+    return _jpeg_buffer(src, max_px=(round(width / inch * _EMBED_DPI), round(height / inch * _EMBED_DPI)))
+
+def _cached_jpeg_bytes(analysis_data, key, width, height):
+    """
+    Encoded JPEG bytes for analysis_data[key] (an image/buffer, or a dict of them), memoized on
+    analysis_data[key + '_bytes'] so a reused analysis skips the encode; callers may pre-fill it
+    """
+    cache_key = key + '_bytes'
+    if analysis_data.get(cache_key) is None and analysis_data.get(key) is not None:
+        src = analysis_data[key]
+        if isinstance(src, dict):
+            analysis_data[cache_key] = {name: _fit_image(img, width, height).getvalue() for name, img in src.items()}
+        else:
+            analysis_data[cache_key] = _fit_image(src, width, height).getvalue()
+    return analysis_data.get(cache_key)
+
+def _encode_report_images(analysis_data):
+    """
+    Fit + encode every image present in analysis_data on a thread pool (Pillow releases the GIL
+    while resampling and encoding); returns {key: buffer | bytes | {sim_type: bytes} | exception}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from reportlab.lib.units import inch
+    
+    def encode(key):
+        w, h = _IMAGE_BOXES[key]
+        try:
+            if key in ('palette_img', 'palette_cb'):
+                return _cached_jpeg_bytes(analysis_data, key, w*inch, h*inch)
+            return _fit_image(analysis_data[key], w*inch, h*inch)
+        except Exception as e:
+            return e
+    
+    keys = [k for k in _IMAGE_BOXES if analysis_data.get(k) is not None or analysis_data.get(k + '_bytes') is not None]
+    if not keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(keys)) as ex:
+        return dict(zip(keys, ex.map(encode, keys)))
+
+def _add_image(story, encoded, box, label, image_dir):
+    """
+    Append an encoded image drawn in box=(w, h) inches plus its spacer; failures are reported and skipped
+    Each distinct image is written once to image_dir, named by its digest: platypus Image reads a .jpg
+    file's size from its header and canvas.drawImage keys the XObject on the filename and embeds the
+    JPEG as-is, so nothing is decoded and repeated images share one XObject
+    """
+    import os
+    from reportlab.platypus import Image, Spacer
+    from reportlab.lib.units import inch
+    
+    try:
+        if isinstance(encoded, Exception):
+            raise encoded
+        if encoded is not None:
+            data = encoded if isinstance(encoded, bytes) else encoded.getvalue()
+            ext = '.jpg' if data[:2] == b'\xff\xd8' else '.png'
+            path = os.path.join(image_dir, hashlib.sha1(data).hexdigest() + ext)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+            story.append(Image(path, width=box[0]*inch, height=box[1]*inch))
+            story.append(Spacer(1, 0.02*inch))
+    except Exception as e:
+        print(f"Error adding {label}: {e}")
+
+def _optimize_pdf(pdf_buffer):
+    """
+    Repack a finished PDF with pikepdf (object streams, recompressed Flate) when it is installed;
+    otherwise, or if the repack fails, the buffer is returned unchanged
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return pdf_buffer
+    
+    try:
+        pdf_buffer.seek(0)
+        out = BytesIO()
+        with pikepdf.Pdf.open(pdf_buffer) as pdf:
+            pdf.save(out, object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                     compress_streams=True, recompress_flate=True)
+        return out
+    except Exception as e:
+        print(f"PDF optimization skipped: {e}")
+        return pdf_buffer
+
+def _image_digest_bytes(src):
+    """Raw bytes identifying an image entry; None for sources that can't be read without consuming them"""
+    if isinstance(src, (bytes, bytearray)):
+        return bytes(src)
+    if hasattr(src, 'getvalue'):
+        return src.getvalue()
+    if hasattr(src, 'tobytes'):
+        return f"{src.mode}{src.size}".encode() + src.tobytes()
+    return None
+
+def _report_cache_key(analysis_data):
+    """
+    sha256 over the report fields (orjson when installed, else json) and the raw bytes of every image
+    the report will embed; None when some input can't be keyed exactly, which disables the cache for that call
+    """
+    fields = {k: v for k, v in analysis_data.items() if k not in _IMAGE_BOXES and not k.endswith('_bytes')}
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    # No default=str: a truncated str() (large arrays, DataFrames) could collide, so such inputs skip the cache
+    try:
+        if orjson is not None:
+            payload = orjson.dumps(fields, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        else:
+            import json
+            payload = json.dumps(fields, sort_keys=True).encode()
+    except (TypeError, ValueError):
+        return None
+    digest = hashlib.sha256(payload)
+    
+    for key in _IMAGE_BOXES:
+        # Key on the source image; the key + '_bytes' memo that rendering writes back into the dict
+        # only counts when the caller supplied it without a source (see _cached_jpeg_bytes)
+        src = analysis_data.get(key)
+        if src is None and key in ('palette_img', 'palette_cb'):
+            src = analysis_data.get(key + '_bytes')
+        if src is None:
+            continue
+        sources = sorted(src.items()) if isinstance(src, dict) else [(None, src)]
+        for name, img in sources:
+            data = _image_digest_bytes(img)
+            if data is None:
+                return None
+            digest.update(f"{key}:{name}:{len(data)}:".encode())
+            digest.update(data)
+    return digest.hexdigest()
+
+def generate_complete_pdf_report(analysis_data, output=None):
+    """
+    Generate complete PDF with ALL visualizations
+    FIXED: Variable naming conflict resolved
+    output: optional writable file object (file, HTTP response) to stream the PDF into; then returns None
+    instead of holding the whole document in a BytesIO; a failed build re-raises, since part of
+    the document may already have been written to output
+    analysis_data['optimize_pdf'] (default True) repacks the in-memory PDF with pikepdf when available
+    Identical inputs are served from an in-process cache of the last few PDFs
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    from reportlab import rl_config
+    
+    # Process-wide ReportLab settings, applied on first use since ReportLab is imported lazily:
+    # embedded images are already zlib/DCT compressed, so ASCII85 only inflates them by ~25%,
+    # and attribute validation on every flowable/style setattr is pure overhead for our own story
+    rl_config.useA85 = 0
+    rl_config.shapeChecking = 0
+    styles = _report_styles()
+    image_dir = None
+    
+    try:
+        cache_key = _report_cache_key(analysis_data)
+        if cache_key is not None:
+            with _PDF_CACHE_LOCK:
+                cached_pdf = _PDF_CACHE.get(cache_key)
+                if cached_pdf is not None:
+                    _PDF_CACHE.move_to_end(cache_key)
+            if cached_pdf is not None:
+                if output is not None:
+                    output.write(cached_pdf)
+                    return None
+                return BytesIO(cached_pdf)
+        
+        pdf_buffer = BytesIO() if output is None else output
+        
+        doc = SimpleDocTemplate(
+            pdf_buffer,
+            pagesize=letter,
+            rightMargin=0.4*inch,
+            leftMargin=0.4*inch,
+            topMargin=0.4*inch,
+            bottomMargin=0.4*inch,
+            pageCompression=1
         )
         
-        # ========== PAGE 1: TITLE & KEY METRICS ==========
-        story.append(Paragraph("Vision Chroma Pro - Complete Analysis Report", title_style))
+        story = []
+        images = _encode_report_images(analysis_data)
+        # Encoded images are handed to ReportLab as files for the duration of the build
+        image_dir = tempfile.mkdtemp(prefix='visionchroma_report_')
         
-        # Metadata
+        # Report fields, read once
         url = analysis_data.get('url', 'N/A')
         timestamp = analysis_data.get('timestamp', 'N/A')
+        score = analysis_data.get('score', 0)
+        issues = analysis_data.get('issues', [])
+        issues_count = len(issues)
+        readability = analysis_data.get('readability') or {}
+        flesch = readability.get('flesch_ease', 'N/A')
+        fk_grade = readability.get('fk_grade', 'N/A')
+        colors_list = analysis_data.get('colors', [])  # <-- RENAMED VARIABLE
+        num_colors = len(colors_list)
+        breakdown = analysis_data.get('breakdown', {})
+        weights = analysis_data.get('weights', {})
+        recs = analysis_data.get('recommendations', [])
+        
+        # ========== PAGE 1: TITLE & KEY METRICS ==========
+        story.append(_static_paragraph("Vision Chroma Pro - Complete Analysis Report", styles['title']))
         
+        # Metadata
         metadata = f"""
         <b>Website:</b> {url[:80]}<br/>
         <b>Generated:</b> {timestamp}<br/>
         <b>Report Type:</b> Comprehensive Accessibility & Readability Analysis
         """
-        story.append(Paragraph(metadata, small_style))
+        story.append(Paragraph(metadata, styles['small']))
         story.append(Spacer(1, 0.03*inch))
         
         # Key Metrics Table
-        score = analysis_data.get('score', 0)
-        issues_count = len(analysis_data.get('issues', []))
-        flesch = analysis_data.get('readability', {}).get('flesch_ease', 'N/A')
-        fk_grade = analysis_data.get('readability', {}).get('fk_grade', 'N/A')
-        colors_list = analysis_data.get('colors', [])  # <-- RENAMED VARIABLE
-        
         metrics_data = [
             ['Metric', 'Value', 'Status'],
-            ['Overall Score', f"{score}/100", 'Good' if score >= 80 else 'Fair' if score >= 60 else 'Needs Work'],
-            ['Contrast Issues', str(issues_count), 'Pass' if issues_count == 0 else 'Action Required'],
+            ['Overall Score', f"{score}/100", _SCORE_STATUS[int(score >= 60) + int(score >= 80)]],
+            ['Contrast Issues', str(issues_count), _ISSUES_STATUS[issues_count > 0]],
             ['Reading Ease', str(flesch), 'Easy' if flesch != 'N/A' and float(str(flesch)) > 60 else 'Moderate'],
             ['Grade Level', str(fk_grade), 'Accessible' if fk_grade != 'N/A' else 'N/A'],
-            ['Total Colors', str(len(colors_list)), 'Detected']
+            ['Total Colors', str(num_colors), 'Detected']
         ]
         
         metrics_table = Table(metrics_data, colWidths=[1.6*inch, 1.2*inch, 1.3*inch])
-        metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), rl_colors.HexColor('#667eea')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), rl_colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
-            ('TOPPADDING', (0, 0), (-1, 0), 5),
-            ('GRID', (0, 0), (-1, -1), 0.5, rl_colors.grey),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [rl_colors.white, rl_colors.HexColor('#f5f5f5')])
-        ]))
+        metrics_table.setStyle(styles['metrics_table'])
         
         story.append(metrics_table)
         story.append(Spacer(1, 0.15*inch))
         
         # ========== SCORE BREAKDOWN ==========
-        story.append(Paragraph("Score Breakdown", heading_style))
+        story.append(_static_paragraph("Score Breakdown", styles['heading']))
         
-        try:
-            if analysis_data.get('score_breakdown_chart') is not None:
-                analysis_data['score_breakdown_chart'].seek(0)
-                img = Image(analysis_data['score_breakdown_chart'], width=4.5*inch, height=3.0*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding score breakdown chart: {e}")
+        _add_image(story, images.get('score_breakdown_chart'), _IMAGE_BOXES['score_breakdown_chart'], 'score breakdown chart', image_dir)
         
         # Score breakdown text
-        breakdown = analysis_data.get('breakdown', {})
-        weights = analysis_data.get('weights', {})
         breakdown_text = f"""
         <b>Contrast:</b> {breakdown.get('contrast', 'N/A')} (Weight: {weights.get('contrast', 'N/A')}%)<br/>
         <b>Readability:</b> {breakdown.get('readability', 'N/A')} (Weight: {weights.get('readability', 'N/A')}%)<br/>
         <b>Content Quality:</b> {breakdown.get('content_quality', 'N/A')} (Weight: {weights.get('content_quality', 'N/A')}%)<br/>
         """
-        story.append(Paragraph(breakdown_text, small_style))
+        story.append(Paragraph(breakdown_text, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== CONTRAST ISSUES ==========
-        story.append(Paragraph("Contrast Analysis", heading_style))
+        story.append(_static_paragraph("Contrast Analysis", styles['heading']))
         
-        try:
-            if analysis_data.get('contrast_chart') is not None:
-                analysis_data['contrast_chart'].seek(0)
-                img = Image(analysis_data['contrast_chart'], width=5.5*inch, height=2.2*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding contrast chart: {e}")
+        _add_image(story, images.get('contrast_chart'), _IMAGE_BOXES['contrast_chart'], 'contrast chart', image_dir)
         
-        issues = analysis_data.get('issues', [])
-        issues_text = f"<b>Total Issues:</b> {len(issues)}<br/>"
-        for i, issue in enumerate(issues[:5], 1):
-            issues_text += f"<b>{i}. {issue['fg']} on {issue['bg']}:</b> Ratio {issue['ratio']:.2f}<br/>"
-        story.append(Paragraph(issues_text, small_style))
+        issues_text = f"<b>Total Issues:</b> {issues_count}<br/>" + ''.join(
+            f"<b>{i}. {issue['fg']} on {issue['bg']}:</b> Ratio {issue['ratio']:.2f}<br/>"
+            for i, issue in enumerate(issues[:5], 1))
+        story.append(Paragraph(issues_text, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== COLOR PALETTE ==========
-        story.append(Paragraph("Color Palette Analysis", heading_style))
+        story.append(_static_paragraph("Color Palette Analysis", styles['heading']))
         
-        try:
-            if analysis_data.get('palette_img') is not None:
-                analysis_data['palette_img'].seek(0)
-                img = Image(analysis_data['palette_img'], width=5.5*inch, height=1.5*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding palette image: {e}")
+        _add_image(story, images.get('palette_img'), _IMAGE_BOXES['palette_img'], 'palette image', image_dir)
         
-        detected_colors = analysis_data.get('colors', [])  # <-- RENAMED VARIABLE
-        palette_text = f"<b>Total Colors:</b> {len(detected_colors)}<br/>"
-        for i, color in enumerate(detected_colors[:10], 1):
-            palette_text += f"<b>{i}. {color}</b><br/>"
-        story.append(Paragraph(palette_text, small_style))
+        palette_text = f"<b>Total Colors:</b> {num_colors}<br/>" + ''.join(
+            f"<b>{i}. {color}</b><br/>" for i, color in enumerate(colors_list[:10], 1))
+        story.append(Paragraph(palette_text, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== COLORBLIND SIMULATIONS ==========
-        story.append(Paragraph("Colorblind Accessibility", heading_style))
+        story.append(_static_paragraph("Colorblind Accessibility", styles['heading']))
         
         try:
-            if analysis_data.get('palette_cb') is not None:
-                for sim_type, img_buffer in analysis_data['palette_cb'].items():
-                    img_buffer.seek(0)
-                    story.append(Paragraph(f"{sim_type.title()} Simulation", subheading_style))
-                    img = Image(img_buffer, width=5.5*inch, height=1.5*inch)
-                    story.append(img)
-                    story.append(Spacer(1, 0.02*inch))
+            palette_cb_bytes = images.get('palette_cb')
+            if isinstance(palette_cb_bytes, Exception):
+                raise palette_cb_bytes
+            if isinstance(palette_cb_bytes, dict):
+                for sim_type, img_bytes in palette_cb_bytes.items():
+                    story.append(Paragraph(f"{sim_type.title()} Simulation", styles['subheading']))
+                    _add_image(story, img_bytes, _IMAGE_BOXES['palette_cb'], 'colorblind simulation', image_dir)
+            elif palette_cb_bytes is not None:
+                # A single simulation image (the app passes one PIL image)
+                _add_image(story, palette_cb_bytes, _IMAGE_BOXES['palette_cb'], 'colorblind simulation', image_dir)
         except Exception as e:
             print(f"Error adding colorblind simulation: {e}")
         story.append(Spacer(1, 0.15*inch))
         
         # ========== AAA COMPLIANCE ==========
-        story.append(Paragraph("AAA Compliance Analysis", heading_style))
+        story.append(_static_paragraph("AAA Compliance Analysis", styles['heading']))
         
-        try:
-            if analysis_data.get('aaa_chart') is not None:
-                analysis_data['aaa_chart'].seek(0)
-                img = Image(analysis_data['aaa_chart'], width=5.5*inch, height=2.2*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding AAA chart: {e}")
+        _add_image(story, images.get('aaa_chart'), _IMAGE_BOXES['aaa_chart'], 'AAA chart', image_dir)
         
         # Note: suggest_aaa_compliant_colors needs to be imported or defined
         # Commenting out for now to avoid errors
         # aaa_data = suggest_aaa_compliant_colors(analysis_data.get('issues', []), analysis_data.get('pairs', []), analysis_data.get('colors', []))
         # For now, just show basic text
-        aaa_text = f"""
-        <b>AAA Compliance Information</b><br/>
-        AAA level requires 7:1 contrast ratio for normal text and 4.5:1 for large text.<br/>
-        Review the contrast issues section for detailed information.
-        """
-        story.append(Paragraph(aaa_text, small_style))
+        story.append(_static_paragraph(_AAA_NOTE_HTML, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== HEATMAP ==========
-        story.append(Paragraph("User Attention Heatmap", heading_style))
+        story.append(_static_paragraph("User Attention Heatmap", styles['heading']))
         
-        try:
-            if analysis_data.get('heatmap') is not None:
-                analysis_data['heatmap'].seek(0)
-                img = Image(analysis_data['heatmap'], width=5.5*inch, height=2.2*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding heatmap: {e}")
+        _add_image(story, images.get('heatmap'), _IMAGE_BOXES['heatmap'], 'heatmap', image_dir)
         story.append(Spacer(1, 0.15*inch))
         
         # ========== TYPOGRAPHY ==========
-        story.append(Paragraph("Typography Metrics", heading_style))
+        story.append(_static_paragraph("Typography Metrics", styles['heading']))
         
-        try:
-            if analysis_data.get('typography_chart') is not None:
-                analysis_data['typography_chart'].seek(0)
-                img = Image(analysis_data['typography_chart'], width=5.5*inch, height=2.2*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.02*inch))
-        except Exception as e:
-            print(f"Error adding typography chart: {e}")
+        _add_image(story, images.get('typography_chart'), _IMAGE_BOXES['typography_chart'], 'typography chart', image_dir)
         
         story.append(Spacer(1, 0.15*inch))
         
         # ========== READABILITY DETAILS ==========
-        story.append(Paragraph("Readability & Content Analysis", heading_style))
-        
-        readability = analysis_data.get('readability', {})
-        
-        readability_text = f"""
-        <b>Flesch Reading Ease:</b> {readability.get('flesch_ease', 'N/A')} 
-        (90-100=Very Easy | 60-70=Easy | 50-60=Moderate | Below 50=Difficult)<br/>
-        <b>Flesch-Kincaid Grade:</b> {readability.get('fk_grade', 'N/A')}<br/>
-        <br/>
-        <b>Best Practices:</b><br/>
-        • Keep sentences under 20 words average<br/>
-        • Use minimum 16px font size for body text<br/>
-        • Maintain line-height between 1.5-1.6x<br/>
-        • Break paragraphs into smaller chunks<br/>
-        • Use clear heading hierarchy (H1 → H6)
-        """
-        story.append(Paragraph(readability_text, small_style))
+        story.append(_static_paragraph("Readability & Content Analysis", styles['heading']))
+        
+        readability_text = (f"<b>Flesch Reading Ease:</b> {flesch} {_FLESCH_SCALE_HTML}"
+                            f"<b>Flesch-Kincaid Grade:</b> {fk_grade}<br/>{_BEST_PRACTICES_HTML}")
+        story.append(Paragraph(readability_text, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== RECOMMENDATIONS ==========
-        story.append(Paragraph("Actionable Recommendations", heading_style))
+        story.append(_static_paragraph("Actionable Recommendations", styles['heading']))
         
-        recs = analysis_data.get('recommendations', [])
-        recs_text = ""
-        for i, rec in enumerate(recs[:20], 1):
-            recs_text += f"<b>{i}.</b> {rec}<br/>"
+        recs_text = ''.join(f"<b>{i}.</b> {rec}<br/>" for i, rec in enumerate(recs[:20], 1))
         
-        story.append(Paragraph(recs_text, small_style))
+        story.append(Paragraph(recs_text, styles['small']))
         story.append(Spacer(1, 0.15*inch))
         
         # ========== WCAG GUIDELINES ==========
-        story.append(Paragraph("WCAG 2.1 Compliance Guidelines", heading_style))
-        
-        wcag_text = """
-        <b>Four Core Principles (POUR):</b><br/>
-        <b>1. Perceivable:</b> Information must be presentable to all users<br/>
-        <b>2. Operable:</b> Interface must be operable by all users<br/>
-        <b>3. Understandable:</b> Content and operations must be clear<br/>
-        <b>4. Robust:</b> Compatible with assistive technologies<br/>
-        <br/>
-        <b>Contrast Standards:</b><br/>
-        • Level A: 3:1 minimum<br/>
-        • Level AA: 4.5:1 for normal text, 3:1 for large text<br/>
-        • Level AAA: 7:1 for normal text, 4.5:1 for large text<br/>
-        <br/>
-        <b>Implementation Checklist:</b><br/>
-        • Add alt text to all images<br/>
-        • Use semantic HTML5 elements<br/>
-        • Ensure keyboard navigation works<br/>
-        • Provide focus indicators<br/>
-        • Test with screen readers (NVDA, JAWS)<br/>
-        • Maintain consistent navigation<br/>
-        • Use proper heading hierarchy
-        """
-        story.append(Paragraph(wcag_text, small_style))
-        story.append(Spacer(1, 0.15*inch))
+        story.extend(_wcag_guidelines_section(styles))
         
         # ========== FOOTER ==========
-        story.append(Paragraph("Resources & Next Steps", heading_style))
+        story.append(_static_paragraph("Resources & Next Steps", styles['heading']))
         
         footer_text = f"""
         <b>Report Summary:</b><br/>
         Website: {url}<br/>
         Date: {timestamp}<br/>
         Overall Score: {score}/100 | Issues: {issues_count}<br/>
-        <br/>
-        <b>Recommended Next Steps:</b><br/>
-        1. Fix all contrast issues (minimum 4.5:1 ratio)<br/>
-        2. Improve content readability (aim for 60+ Flesch score)<br/>
-        3. Test manually with keyboard navigation<br/>
-        4. Use screen reader software (NVDA/JAWS)<br/>
-        5. Re-run this analysis after fixes<br/>
-        <br/>
-        <b>Learn More:</b><br/>
-        • WCAG 2.1: https://www.w3.org/WAI/WCAG21/<br/>
-        • WebAIM Contrast Checker: https://webaim.org/resources/contrastchecker/<br/>
-        • Accessible Colors: https://accessible-colors.com/<br/>
-        • A11Y Project: https://www.a11yproject.com/<br/>
-        <br/>
-        <i>Report generated by Vision Chroma Pro Professional Edition</i>
-        """
+        """ + _FOOTER_TAIL_HTML
         
-        story.append(Paragraph(footer_text, ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            alignment=TA_LEFT,
-            textColor=rl_colors.grey,
-            spaceAfter=0,
-            spaceBefore=0
-        )))
+        story.append(Paragraph(footer_text, styles['footer']))
         
         # Build PDF
         doc.build(story)
-        pdf_buffer.seek(0)
         print("[SUCCESS] PDF generated successfully")
+        if output is not None:
+            return None
+        if analysis_data.get('optimize_pdf', True):
+            pdf_buffer = _optimize_pdf(pdf_buffer)
+        if cache_key is not None:
+            with _PDF_CACHE_LOCK:
+                _PDF_CACHE[cache_key] = pdf_buffer.getvalue()
+                while len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+                    _PDF_CACHE.popitem(last=False)
+        pdf_buffer.seek(0)
         return pdf_buffer
         
     except Exception as e:
         print(f"[ERROR] PDF generation failed: {e}")
         print(traceback.format_exc())
+        if output is not None:
+            raise
         
         error_buffer = BytesIO()
         error_buffer.write(b"PDF generation failed")
         error_buffer.seek(0)
-        return error_buffer
\ No newline at end of file
+        return error_buffer
+    
+    finally:
+        if image_dir is not None:
+            shutil.rmtree(image_dir, ignore_errors=True)
+
+def generate_reports_parallel(analyses, max_workers=None):
+    """
+    Build several reports in worker processes (doc.build is CPU-bound and holds the GIL)
+    analysis dicts (BytesIO charts, PIL images) are pickled to the workers; returns PDF buffers in input order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(generate_complete_pdf_report, analyses))
@@ -1,10 +1,38 @@
+import math
+from collections import Counter
 import textstat
 
+def _legacy_round(number, points):
+    """Round half away from zero, as textstat does, so scores match textstat.flesch_*"""
+    p = 10 ** points
+    return math.floor(number * p + math.copysign(0.5, number)) / p
+
+def _syllable_count(text):
+    """
+    textstat.syllable_count, hyphenating each distinct word once and weighting by its frequency;
+    pages repeat words heavily, so this skips most of the per-word pyphen work
+    """
+    pyphen = getattr(textstat.textstat, 'pyphen', None)
+    if pyphen is None:
+        return textstat.syllable_count(text)
+    words = Counter(textstat.remove_punctuation(text.lower()).split())
+    return sum((len(pyphen.positions(word)) + 1) * n for word, n in words.items())
+
+def _flesch_scores(text):
+    """(FK grade, Flesch ease) from one set of word/sentence/syllable counts"""
+    words = textstat.lexicon_count(text)
+    sentences = textstat.sentence_count(text)
+    syllables = _syllable_count(text)
+    asl = _legacy_round(words / sentences, 1) if sentences else 0.0
+    asw = _legacy_round(syllables / words, 1) if words else 0.0
+    fk = _legacy_round(0.39 * asl + 11.8 * asw - 15.59, 1)
+    fe = _legacy_round(206.835 - 1.015 * asl - 84.6 * asw, 2)
+    return fk, fe
+
 def analyze_readability(text):
     if not text or len(text.strip())<80:
         return {"fk_grade": None, "summary": "Not enough text to analyze."}
-    fk = textstat.flesch_kincaid_grade(text)
-    fe = textstat.flesch_reading_ease(text)  # Added: Compute Flesch Reading Ease score
+    fk, fe = _flesch_scores(text)  # Added: Flesch Reading Ease alongside FK, from shared counts
     summary = "Moderate"
     if fe < 50:  # Adjusted: Use Flesch Ease for summary (low = complex), keeping your thresholds similar
         summary = "Complex — simplify sentences and words."
@@ -18,4 +46,4 @@ def analyze_readability(text):
         "fk_grade": round(fk,2) if fk else None,
         "flesch_ease": round(fe,2) if fe else None,  # Added: Include for compatibility with typography analysis
         "summary": summary
-    }
\ No newline at end of file
+    }
@@ -2,8 +2,44 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.units import mm
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Frame, Paragraph
+from reportlab import rl_config
+from xml.sax.saxutils import escape
 import os
 
+# Skip ReportLab's per-setattr attribute validation for the whole process
+rl_config.shapeChecking = 0
+
+# Built once per process; 10pt on 12pt leading matches the rest of the report
+_REC_STYLE = ParagraphStyle('Rec', parent=getSampleStyleSheet()['Normal'], fontName='Helvetica', fontSize=10, leading=12)
+_REC_BOTTOM = 76
+
+def _flow(c, flowables, frame, next_frame):
+    """
+    Draw flowables into frame, splitting items that don't fit and continuing on new pages
+    (next_frame() builds the frame for each new page); an item that can't be split even on a fresh
+    page is reported and skipped so the rest still get drawn
+    """
+    fresh = False
+    while flowables:
+        f = flowables[0]
+        if frame.add(f, c, trySplit=1):
+            del flowables[0]
+            fresh = False
+            continue
+        parts = frame.split(f, c)
+        if len(parts) > 1:
+            flowables[0:1] = parts
+            continue
+        if fresh:
+            print(f"Skipped a recommendation too large for a page: {f.identity()[:80]}")
+            del flowables[0]
+            continue
+        c.showPage()
+        frame = next_frame()
+        fresh = True
+
 def generate_pdf_report(output_path, site_url, access_report, read_report, heatmap_path, color_images):
     c = canvas.Canvas(output_path, pagesize=A4)
     W, H = A4
@@ -53,12 +89,10 @@ def generate_pdf_report(output_path, site_url, access_report, read_report, heatm
     y -= 16
     c.setFont("Helvetica", 10)
     recs = access_report.get('recommendations', []) + ["Improve content clarity where FK grade is high."]
-    for r in recs:
-        c.drawString(40, y, "- " + r)
-        y -= 12
-        if y < 80:
-            c.showPage()
-            y = H-80
+    # Recommendations are wrapped and paginated by a Frame instead of line-by-line drawString
+    flowables = [Paragraph(escape("- " + r), _REC_STYLE) for r in recs]
+    frame = Frame(40, _REC_BOTTOM, W-80, y+10-_REC_BOTTOM, 0, 0, 0, 0)
+    _flow(c, flowables, frame, lambda: Frame(40, _REC_BOTTOM, W-80, H-70-_REC_BOTTOM, 0, 0, 0, 0))
     c.showPage()
     c.save()
     return output_path
@@ -4,54 +4,136 @@ from urllib.parse import urljoin
 import pandas as pd
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 
-def fetch_website_content(url, timeout=12):
-    headers = {
-        "User-Agent":"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116 Safari/537.36",
-        "Accept":"text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Referer":"https://www.google.com"
-    }
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+_COLOR_RE = re.compile(r'(?:color|background(?:-color)?)\s*:\s*([^;}{]+);?', re.IGNORECASE)
+_FONT_RE = re.compile(r'font[- ]?family\s*:\s*([^;}{]+);?', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_SCHEME_RE = re.compile(r'^https?://')
+# Per-stylesheet and total CSS caps keep memory and regex time bounded on huge stylesheets
+_CSS_MAX_BYTES = 256 * 1024
+_COMBINED_CSS_MAX_CHARS = 2 * 1024 * 1024
+# Inline styles this long already give enough color/font samples to skip the stylesheet round trips
+_INLINE_CSS_SUFFICIENT = 8192
+_TEXT_TAGS = frozenset(('p','li','h1','h2','h3','span','a'))
+_BUTTON_TAGS = frozenset(('button','a'))
+
+# Connection pools live in these adapters and are shared across calls; sessions (and so cookie
+# jars) are not. Pages retry transient errors, stylesheets are best-effort and give up after one try
+_PAGE_ADAPTER = HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429,500,502,503,504]),
+                            pool_connections=10, pool_maxsize=10)
+_CSS_ADAPTER = HTTPAdapter(max_retries=0, pool_connections=10, pool_maxsize=10)
+
+def _make_session(adapter):
+    """Fresh session with its own cookie jar over a shared adapter (not closed: that would drop the pool)"""
     session = requests.Session()
-    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429,500,502,503,504])
-    session.mount("https://", HTTPAdapter(max_retries=retries))
-    session.mount("http://", HTTPAdapter(max_retries=retries))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_FETCH_HEADERS = {
+    "User-Agent":"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116 Safari/537.36",
+    "Accept":"text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Referer":"https://www.google.com"
+}
+_PROXY_PREFIX = "https://r.jina.ai/http://"
+
+def _proxy_url(url):
+    """Reader-proxy URL used when the direct fetch fails"""
+    return _PROXY_PREFIX + _SCHEME_RE.sub('', url, count=1)
+
+def fetch_website_content(url, timeout=12):
+    session = _make_session(_PAGE_ADAPTER)
     try:
-        r = session.get(url, headers=headers, timeout=timeout)
+        r = session.get(url, headers=_FETCH_HEADERS, timeout=timeout)
         r.raise_for_status()
         r.encoding = r.apparent_encoding
         return r.text
     except Exception as e:
-        try:
-            stripped = re.sub(r'^https?://','',url)
-            proxy = f"https://r.jina.ai/http://{stripped}"
-            pr = session.get(proxy, headers=headers, timeout=timeout)
-            pr.raise_for_status()
-            return pr.text
-        except Exception:
-            print("❌ Fetch failed:", e)
-            return None
-
-def extract_website_data(html, base_url):
-    soup = BeautifulSoup(html, 'html.parser')
-    nodes = soup.find_all(['p','li','h1','h2','h3','span','a'])
-    text = " ".join([n.get_text(" ",strip=True) for n in nodes])
-    text = re.sub(r'\s+',' ', text).strip()
-    inline_styles = [t.get('style') for t in soup.find_all(style=True) if t.get('style')]
-    combined_css = "\n".join(inline_styles)
-    css_links = [urljoin(base_url, l.get('href')) for l in soup.find_all('link', rel='stylesheet') if l.get('href')]
-    for css in css_links[:5]:
-        try:
-            r = requests.get(css, timeout=6)
+        error = e
+    try:
+        pr = session.get(_proxy_url(url), headers=_FETCH_HEADERS, timeout=timeout)
+        pr.raise_for_status()
+        return pr.text
+    except Exception:
+        pass
+    print("❌ Fetch failed:", error)
+    return None
+
+def _safe_get(url, session, timeout=6, max_bytes=_CSS_MAX_BYTES):
+    """First max_bytes of a 200 response body, or None on any error/other status"""
+    try:
+        with session.get(url, timeout=timeout, stream=True) as r:
             if r.status_code==200:
-                combined_css += "\n" + r.text
-        except:
-            pass
-    color_matches = re.findall(r'(?:color|background(?:-color)?)\s*:\s*([^;}{]+);?', combined_css, flags=re.IGNORECASE)
-    font_matches = re.findall(r'font[- ]?family\s*:\s*([^;}{]+);?', combined_css, flags=re.IGNORECASE)
-    colors = sorted(list({c.strip() for c in color_matches if c.strip() and len(c.strip())<40}))
-    fonts = sorted(list({f.strip().strip('"').strip("'") for f in font_matches if f.strip()}))
+                body = r.raw.read(max_bytes, decode_content=True)
+                return body.decode(r.encoding or 'utf-8', errors='ignore')
+    except Exception:
+        pass
+    return None
+
+def extract_website_data(html, base_url, fetch_external_css=None):
+    """
+    fetch_external_css: True always fetches linked stylesheets, False never does, None (default)
+    skips them when the inline styles alone already reach _INLINE_CSS_SUFFICIENT characters
+    """
+    # No SoupStrainer: the inline-style scan below needs every tag, not just the text tags
+    soup = BeautifulSoup(html, _HTML_PARSER)
+    # One walk over the tree fills every per-category list
+    texts, inline_styles, css_links, images, buttons = [], [], [], [], []
+    # Outermost text tag collected so far; text tags nested in it are already part of its text
+    text_root = None
+    for tag in soup.find_all(True):
+        name = tag.name
+        label = None
+        if name in _TEXT_TAGS and (text_root is None or not any(p is text_root for p in tag.parents)):
+            text_root = tag
+            label = tag.get_text(" ",strip=True)
+            texts.append(label)
+        if name in _BUTTON_TAGS:
+            if label is None:
+                label = tag.get_text(" ",strip=True)
+            if label:
+                buttons.append(label)
+        style = tag.get('style')
+        if style:
+            inline_styles.append(style)
+        if name == 'link':
+            if 'stylesheet' in (tag.get('rel') or ()) and tag.get('href'):
+                css_links.append(urljoin(base_url, tag.get('href')))
+        elif name == 'img' and tag.get('src'):
+            images.append(urljoin(base_url, tag.get('src')))
+    text = _WS_RE.sub(' ', " ".join(texts)).strip()
+    combined_css = "\n".join(inline_styles)
+    # Stylesheets are fetched concurrently: the phase costs the slowest RTT instead of the sum
+    if fetch_external_css is None:
+        fetch_external_css = len(combined_css) < _INLINE_CSS_SUFFICIENT
+    if css_links and fetch_external_css:
+        session = _make_session(_CSS_ADAPTER)
+        with ThreadPoolExecutor(max_workers=5) as ex:
+            for css_text in ex.map(lambda u: _safe_get(u, session), css_links[:5]):
+                if css_text is not None:
+                    combined_css += "\n" + css_text
+    combined_css = combined_css[:_COMBINED_CSS_MAX_CHARS]
+    color_matches = _COLOR_RE.findall(combined_css)
+    font_matches = _FONT_RE.findall(combined_css)
+    color_set = set()
+    for c in color_matches:
+        c = c.strip()
+        if c and len(c)<40:
+            color_set.add(c)
+    font_set = set()
+    for f in font_matches:
+        f = f.strip()
+        if f:
+            font_set.add(f.strip('"').strip("'"))
+    colors = sorted(color_set)
+    fonts = sorted(font_set)
     df_colors = pd.DataFrame(colors, columns=['Color Values']) if colors else pd.DataFrame(columns=['Color Values'])
     df_fonts = pd.DataFrame(fonts, columns=['Font Values']) if fonts else pd.DataFrame(columns=['Font Values'])
-    images = [urljoin(base_url, img.get('src')) for img in soup.find_all('img') if img.get('src')]
-    buttons = [b.get_text(" ",strip=True) for b in soup.find_all(['button','a']) if b.get_text(strip=True)]
     return {"text": text, "colors": df_colors, "fonts": df_fonts, "images": images, "buttons": buttons}
@@ -0,0 +1,37 @@
+import json
+
+from modules.accessibility_check import (
+    analyze_typography_details,
+    compute_score_breakdown,
+    export_analysis_json,
+    suggest_aaa_compliant_colors,
+)
+
+
+def test_suggest_aaa_compliant_colors_shape():
+    pairs = [{'fg': '#000', 'bg': '#fff', 'ratio': 21.0}, {'fg': '#777', 'bg': '#fff', 'ratio': 4.6}]
+    result = suggest_aaa_compliant_colors([], pairs, [])
+    assert result['aaa_compliant'] == 1
+    assert result['total_pairs'] == 2
+    assert result['percentage'] == 50.0
+    assert 'suggestion' in result['needs_work'][0]
+
+
+def test_compute_score_breakdown_keeps_weights():
+    result = compute_score_breakdown(1, 4, {'flesch_ease': 60}, 500)
+    assert result['weights'] == {'contrast': 50, 'readability': 30, 'content_quality': 20}
+    assert result['breakdown'] == {'contrast': 85.0, 'readability': 80, 'content_quality': 75}
+    assert result['weighted_score'] == 81.5
+
+
+def test_export_analysis_json_schema():
+    data = {'url': 'https://example.com', 'score': 70, 'issues': [{'ratio': 3.0}], 'colors': ['#fff']}
+    export = json.loads(export_analysis_json(data))
+    assert set(export) == {'metadata', 'scores', 'compliance', 'colors', 'content'}
+    assert export['compliance'] == {'wcag_aa_issues': 1, 'wcag_aaa_issues': 1}
+
+
+def test_analyze_typography_details_counts_period_sentences():
+    result = analyze_typography_details("One two. Three four five. Six", {})
+    assert result['sentence_count'] == 3
+    assert result['avg_words_per_sentence'] == 2.0
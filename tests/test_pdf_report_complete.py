@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from modules.pdf_report_complete import generate_complete_pdf_report
+
+
+def _analysis(**overrides):
+    data = {
+        'url': 'https://example.com',
+        'timestamp': '2026-01-01 00:00',
+        'score': 72,
+        'issues': [{'fg': '#777777', 'bg': '#ffffff', 'ratio': 4.48}],
+        'readability': {'flesch_ease': 62.1, 'fk_grade': 8.3},
+        'colors': ['#112233', '#445566'],
+        'recommendations': ['Raise contrast'],
+        'optimize_pdf': False,
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.parametrize('score', [np.float64(85.0), np.int64(65), np.float32(10.0)])
+def test_numpy_score_builds_a_pdf(score):
+    pdf = generate_complete_pdf_report(_analysis(score=score)).getvalue()
+    assert pdf.startswith(b'%PDF')
+
+
+def test_failed_build_returns_error_buffer():
+    result = generate_complete_pdf_report(_analysis(issues=[{'fg': '#000'}]))
+    assert result.getvalue() == b'PDF generation failed'
+
+
+def test_failed_build_with_output_raises():
+    with pytest.raises(KeyError):
+        generate_complete_pdf_report(_analysis(issues=[{'fg': '#000'}]), output=BytesIO())
+
+
+def test_output_receives_pdf_and_returns_none():
+    out = BytesIO()
+    assert generate_complete_pdf_report(_analysis(url='https://example.org/streamed'), output=out) is None
+    assert out.getvalue().startswith(b'%PDF')
+
+
+def _palette(color):
+    from PIL import Image
+    return Image.new('RGB', (120, 20), color)
+
+
+def test_repeat_call_on_same_analysis_hits_cache(monkeypatch):
+    from reportlab.platypus import SimpleDocTemplate
+    builds = []
+    original = SimpleDocTemplate.build
+    monkeypatch.setattr(SimpleDocTemplate, 'build', lambda self, *a, **k: builds.append(1) or original(self, *a, **k))
+    data = _analysis(url='https://example.org/repeat', palette_img=_palette((10, 200, 30)))
+    first = generate_complete_pdf_report(data).getvalue()
+    assert 'palette_img_bytes' in data
+    second = generate_complete_pdf_report(data).getvalue()
+    assert first == second
+    assert len(builds) == 1
+
+
+def test_prefilled_palette_bytes_are_part_of_the_cache_key():
+    from modules.pdf_report_complete import _jpeg_buffer, _report_cache_key
+    a = _analysis(palette_img_bytes=_jpeg_buffer(_palette((255, 0, 0))).getvalue())
+    b = _analysis(palette_img_bytes=_jpeg_buffer(_palette((0, 0, 255))).getvalue())
+    assert _report_cache_key(a) != _report_cache_key(b)
@@ -0,0 +1,38 @@
+import base64
+import re
+import zlib
+
+from modules.report_generator import generate_pdf_report
+
+
+def _page_text(pdf):
+    """Concatenated content streams, decoded when ASCII85/Flate encoded"""
+    chunks = []
+    for filters, raw in re.findall(rb"<<([^>]*)>>\s*stream\r?\n(.*?)\r?\n?endstream", pdf, re.S):
+        if b"/ASCII85Decode" in filters:
+            raw = base64.a85decode(raw.strip().removesuffix(b"~>"))
+        if b"/FlateDecode" in filters:
+            raw = zlib.decompress(raw)
+        chunks.append(raw)
+    return b"".join(chunks)
+
+
+def _report(tmp_path, recs):
+    out = tmp_path / "report.pdf"
+    access = {'score': 80, 'avg_contrast': 4.2, 'features': {}, 'recommendations': recs}
+    generate_pdf_report(str(out), "https://example.com", access, {'fk_grade': 8}, None, {})
+    return _page_text(out.read_bytes())
+
+
+def test_short_recommendations_are_drawn(tmp_path):
+    pdf = _report(tmp_path, ["Raise contrast", "Add alt text"])
+    assert b"Raise contrast" in pdf and b"Add alt text" in pdf
+    assert b"Improve content clarity" in pdf
+
+
+def test_recommendation_taller_than_a_page_is_split_not_dropped(tmp_path):
+    recs = [" ".join(["word"] * 3000) + f" endmark{i}" for i in range(5)]
+    pdf = _report(tmp_path, recs)
+    for i in range(5):
+        assert f"endmark{i}".encode() in pdf
+    assert b"Improve content clarity" in pdf